@@ -0,0 +1,100 @@
+"""
+Measures the cold import time of the package modules, each in a fresh python
+interpreter, and checks it against an import-time budget. Also checks that modules
+do not pull in heavy dependencies at import (they should be imported on first use),
+and measures how long a new regression pool worker takes to return its first fit.
+Exits with a non-zero status if anything is over budget.
+"""
+
+import sys
+import time
+import tempfile
+import subprocess
+import statistics
+
+# input ----------------------------------------------------------
+package  = 'materials_for_ole_hesselager_tryg_2025'
+budgets  = {'':            0.05,  # module: budget in seconds
+            'config':      0.05,
+            'misc':        0.05,
+            'nao_archive': 0.15,
+            'features':    0.5,
+            'regression':  0.5,
+}
+budget_worker = 0.2  # seconds from pool start to first fit_design_matrix result
+heavy    = ['numpy', 'pandas', 'xarray', 'scipy', 'matplotlib', 'statsmodels', 'netCDF4']
+allowed  = {'nao_archive': ['numpy'],
+            'features':    ['numpy', 'pandas'],
+            'regression':  ['numpy', 'pandas'],
+}
+n_repeat = 5
+# ----------------------------------------------------------------
+
+
+def measure_import(module, heavy):
+    """imports module in a fresh interpreter, returns import time and heavy modules loaded"""
+    code = ("import sys, time\n"
+            "t = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - t)\n"
+            f"print(','.join(m for m in {heavy!r} if m in sys.modules))\n")
+    out  = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split('\n')
+    return float(out[0]), [m for m in out[1].split(',') if m]
+
+
+
+def measure_worker_start(package, n_repeat):
+    """
+    times a fresh single-worker pool (regression.worker_context) from start until its
+    first fit_design_matrix result on a small design matrix. The first pool also
+    starts the forkserver, which preloads statsmodels, and is returned separately.
+    """
+    import importlib
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy  as np
+    import pandas as pd
+    features   = importlib.import_module(f'{package}.features')
+    regression = importlib.import_module(f'{package}.regression')
+
+    # synthetic claims and nao features, 10 years x 2 regions
+    rng    = np.random.default_rng(0)
+    months = pd.date_range('2010-01', periods=120, freq='MS')
+    nao    = pd.Series(rng.normal(size=len(months)), index=months)
+    claims = features.aggregate_claims_monthly(features.synthetic_claims(nao, regions=['a', 'b']))
+    feats  = pd.DataFrame({'init_time': months, 'valid_time': months, 'nao_mean': nao.values,
+                           'nao_spread': rng.random(len(months)), 'nao_frac_positive': rng.random(len(months))})
+    df     = features.build_design_matrix(claims, feats, 'benchmark', 1)
+
+    times = []
+    with tempfile.TemporaryDirectory() as path:
+        filename = features.write_design_matrix(df, f'{path}/design.nc')
+        for i in range(n_repeat + 1):
+            t = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=1, mp_context=regression.worker_context()) as executor:
+                executor.submit(regression.fit_design_matrix, filename, [1], features.feature_names, 'n_claims', 'claims_total').result()
+            times.append(time.perf_counter() - t)
+
+    return times[0], statistics.median(times[1:])
+
+
+
+if __name__ == "__main__":
+
+    failed = False
+    for name, budget in budgets.items():
+        module  = f'{package}.{name}' if name else package
+        results = [measure_import(module, heavy) for i in range(n_repeat)]
+        median  = statistics.median(t for t, _ in results)
+        loaded  = results[0][1]
+        extra   = [m for m in loaded if m not in allowed.get(name, [])]
+        ok      = (median <= budget) and not extra
+        failed  = failed or not ok
+
+        print(f"{'ok  ' if ok else 'FAIL'} {module:50s} {median*1e3:8.1f} ms (budget {budget*1e3:.0f} ms) heavy imports: {', '.join(loaded) or '-'}")
+
+    server_start, worker_start = measure_worker_start(package, n_repeat)
+    ok     = worker_start <= budget_worker
+    failed = failed or not ok
+    print(f"{'ok  ' if ok else 'FAIL'} {'regression pool worker, first fit':50s} {worker_start*1e3:8.1f} ms (budget {budget_worker*1e3:.0f} ms) first pool incl. forkserver start: {server_start*1e3:.1f} ms")
+
+    sys.exit(1 if failed else 0)
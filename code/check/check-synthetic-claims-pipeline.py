@@ -0,0 +1,59 @@
+"""
+End-to-end check of the claims pipeline on synthetic claims: claims generated from
+era5 nao with a known effect are aggregated, joined with the nao files in data/ and
+fitted in parallel. The GLM must recover the effect for era5 and report NaN (not a
+fitted zero) for the constant era5 nao_spread. Exits with a non-zero status on failure.
+"""
+
+import sys
+import tempfile
+import numpy  as np
+import xarray as xr
+from materials_for_ole_hesselager_tryg_2025 import config, features, regression
+
+# input ----------------------------------------------------------
+models      = ['ecmwf', 'era5']
+lead_months = [1, 2]
+timestamp   = '2009-01_2024-12'
+path_in     = config.dirs['data']
+nao_effect  = 0.3
+tolerance   = 0.1
+n_jobs      = 4
+# ----------------------------------------------------------------
+
+
+def load_nao_datasets(path_in, models, timestamp):
+    datasets = {}
+    for model in models:
+        if model == 'era5':
+            datasets[model] = xr.open_dataset(f'{path_in}nao_era5_{timestamp}.nc')
+        else:
+            datasets[model] = xr.open_dataset(f'{path_in}nao_{model}_{config.model_systems[model]}_{timestamp}.nc')
+    return datasets
+
+
+
+if __name__ == "__main__":
+
+    datasets       = load_nao_datasets(path_in, models, timestamp)
+    nao            = datasets['era5']['nao'].sel(forecastMonth=1).to_series()
+    claims         = features.synthetic_claims(nao, regions=['north', 'south', 'east'], nao_effect=nao_effect)
+    claims_monthly = features.aggregate_claims_monthly(claims)
+    systems        = {model: config.model_systems.get(model) for model in models}
+
+    with tempfile.TemporaryDirectory() as path_out:
+        filenames     = features.build_design_matrices(claims_monthly, datasets, lead_months, systems, path_out + '/')
+        ds_glm, ds_lr = regression.fit_all(filenames, n_jobs=n_jobs)
+
+    coef   = ds_glm['coef'].sel(model='era5', predictor='nao_mean')
+    spread = ds_glm['coef'].sel(model='era5', predictor='nao_spread')
+    checks = {f'era5 nao_mean GLM coef within {tolerance} of {nao_effect}': bool(np.abs(coef.median() - nao_effect) < tolerance),
+              'era5 nao_spread GLM coef is NaN': bool(spread.isnull().all()),
+              'era5 nao_spread LR coef is NaN': bool(ds_lr['coef'].sel(model='era5', predictor='nao_spread').isnull().all()),
+              'ecmwf nao_spread GLM coef is fitted': bool(ds_glm['coef'].sel(model='ecmwf', predictor='nao_spread').notnull().all())}
+
+    print(f"era5 nao_mean GLM coef (median over target months and leads): {float(coef.median()):.3f}")
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+
+    sys.exit(0 if all(checks.values()) else 1)
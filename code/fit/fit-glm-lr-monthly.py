@@ -0,0 +1,43 @@
+"""
+Fits poisson GLMs (claim counts) and linear regressions (claim totals) on nao forecast
+features for all model x lead month x target month combinations, using the design
+matrices from calc-design-matrix-monthly.py. synthetic must match the setting
+used there, fits to synthetic claims are written with a '_synthetic' suffix.
+"""
+
+import os
+import numpy  as np
+from materials_for_ole_hesselager_tryg_2025 import config, misc, features, regression
+
+# input ----------------------------------------------------------
+models        = config.models + ['era5']
+lead_months   = [1, 2, 3, 4, 5, 6]
+target_months = np.arange(1, 13, 1)
+predictors    = features.feature_names
+response_glm  = 'n_claims'
+response_lr   = 'claims_total'
+n_jobs        = 8
+synthetic     = False
+path_in       = config.dirs['processed_features'] + ('synthetic/' if synthetic else '')
+path_out_glm  = config.dirs['processed_glm']
+path_out_lr   = config.dirs['processed_lr']
+write2file    = True
+# ----------------------------------------------------------------
+
+
+if __name__ == "__main__":
+
+    misc.tic()
+    filenames = {(model, lead_month): features.design_matrix_filename(path_in, model, config.model_systems.get(model), lead_month)
+                 for model in models for lead_month in lead_months}
+
+    ds_glm, ds_lr = regression.fit_all(filenames, target_months, predictors, response_glm, response_lr, n_jobs)
+    print(ds_lr['r2'].sel(lead_month=1))
+
+    if write2file:
+        os.makedirs(path_out_glm, exist_ok=True)
+        os.makedirs(path_out_lr, exist_ok=True)
+        suffix = '_synthetic' if synthetic else ''
+        ds_glm.to_netcdf(f'{path_out_glm}glm_{response_glm}_nao{suffix}.nc')
+        ds_lr.to_netcdf(f'{path_out_lr}lr_{response_lr}_nao{suffix}.nc')
+    misc.toc()
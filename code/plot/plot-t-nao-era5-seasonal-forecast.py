@@ -3,10 +3,11 @@ compares yearly nao timeseries from monthly era5 and a seasonal forecast.
 Options for lead month, model, aggregation (month, season, quarter). 
 """
 
+import os
 import numpy            as np
 import xarray           as xr
 import pandas           as pd
-from materials_for_ole_hesselager_tryg_2025           import config, misc
+from materials_for_ole_hesselager_tryg_2025           import config, misc, nao_archive
 from matplotlib         import pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.colors  import to_rgba
@@ -21,11 +22,23 @@ lead_month       = 1
 target_month     = 1
 path_in_era5     = config.dirs['processed_era5_forecast_monthly']
 path_in_forecast = config.dirs['processed_forecast_monthly']
+filename_archive = config.dirs['data'] + 'nao_2009-01_2024-12.naoarc'
 path_out         = config.dirs['fig'] + 'forecast/' 
 write2file       = False
 # --------------------------------------------------
 
 
+def load_nao_data_from_archive(filename_archive, init_years, model):
+    """Fast path: memory-mapped archive from calc-nao-archive.py, hPa conversion applied lazily on selection"""
+
+    archive     = nao_archive.load_nao_archive(filename_archive)
+    init_times  = slice(f'{init_years[0]}-01', f'{init_years[-1]}-12')
+    ds_forecast = archive.to_dataset(model, divide_by=1000).sel(forecast_reference_time=init_times)
+    ds_era5     = archive.to_dataset('era5', divide_by=1000).sel(forecast_reference_time=init_times)
+
+    return ds_era5, ds_forecast
+
+
 def load_nao_data(path_in_era5, path_in_forecast, init_years, model, system):
 
     # Load full datasets
@@ -150,7 +163,12 @@ def plot_nao(nao_era5, nao_forecast, lead_month, target_month, write2file, filen
         
 if __name__ == "__main__":
 
-    ds_era5, ds_forecast = load_nao_data(path_in_era5,path_in_forecast,init_years,model,system)
+    if os.path.exists(filename_archive) and not nao_archive.load_nao_archive(filename_archive).stale_sources():
+        ds_era5, ds_forecast = load_nao_data_from_archive(filename_archive,init_years,model)
+    else:
+        if os.path.exists(filename_archive):
+            print(f"Archive {filename_archive} is older than its source files, rebuild it with calc-nao-archive.py. Loading NetCDF files instead.")
+        ds_era5, ds_forecast = load_nao_data(path_in_era5,path_in_forecast,init_years,model,system)
     ds_era5              = filter_forecasts_by_valid_month(ds_era5, lead_month, target_month)
     ds_forecast          = filter_forecasts_by_valid_month(ds_forecast, lead_month, target_month)
 
@@ -0,0 +1,71 @@
+"""
+Builds design matrices joining monthly nao forecast features of each model and lead month
+with claims aggregated by region and month. One NetCDF file per model and lead month.
+era5 nao in seasonal forecast format is included as a 'perfect forecast' reference.
+Set synthetic = True to run the pipeline on synthetic claims generated from era5 nao,
+output then goes to a separate synthetic/ subdirectory so it is never mistaken for real claims.
+"""
+
+import os
+import xarray as xr
+import pandas as pd
+from materials_for_ole_hesselager_tryg_2025 import config, misc, features, nao_archive
+
+# input ----------------------------------------------------------
+models           = config.models + ['era5']
+lead_months      = [1, 2, 3, 4, 5, 6]
+timestamp        = '2009-01_2024-12'
+path_in_nao      = config.dirs['data']
+filename_archive = path_in_nao + f'nao_{timestamp}.naoarc'
+filename_claims  = config.dirs['raw_tryg'] + 'claims.csv'
+region_col       = 'region'
+date_col         = 'date'
+amount_col       = 'amount'
+synthetic        = False
+path_out         = config.dirs['processed_features'] + ('synthetic/' if synthetic else '')
+overwrite        = False
+# ----------------------------------------------------------------
+
+
+def load_nao_datasets(filename_archive, path_in_nao, models, timestamp):
+    """nao datasets from the archive, or from the NetCDF files if the archive is missing or stale"""
+    if os.path.exists(filename_archive):
+        archive = nao_archive.load_nao_archive(filename_archive)
+        stale   = archive.stale_sources()
+        if not stale:
+            return {model: archive.to_dataset(model) for model in models}
+        print(f"Archive {filename_archive} is older than {stale}, rebuild it with calc-nao-archive.py. Loading NetCDF files instead.")
+
+    datasets = {}
+    for model in models:
+        if model == 'era5':
+            datasets[model] = xr.open_dataset(f'{path_in_nao}nao_era5_{timestamp}.nc')
+        else:
+            datasets[model] = xr.open_dataset(f'{path_in_nao}nao_{model}_{config.model_systems[model]}_{timestamp}.nc')
+    return datasets
+
+
+
+def load_claims(filename_claims, synthetic, ds_era5):
+    if synthetic:
+        nao = ds_era5['nao'].sel(forecastMonth=1).to_series()
+        return features.synthetic_claims(nao, regions=['north', 'south', 'east', 'west'])
+    if filename_claims.endswith('.xlsx'):
+        return pd.read_excel(filename_claims)
+    return pd.read_csv(filename_claims)
+
+
+
+if __name__ == "__main__":
+
+    misc.tic()
+    datasets       = load_nao_datasets(filename_archive, path_in_nao, models, timestamp)
+    claims         = load_claims(filename_claims, synthetic, datasets['era5'])
+    claims_monthly = features.aggregate_claims_monthly(claims, region_col, date_col, amount_col)
+    systems        = {model: config.model_systems.get(model) for model in models}
+
+    os.makedirs(path_out, exist_ok=True)
+    filenames = features.build_design_matrices(claims_monthly, datasets, lead_months, systems, path_out, overwrite)
+    for filename in filenames.values():
+        print(filename)
+    misc.toc()
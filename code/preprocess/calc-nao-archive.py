@@ -0,0 +1,41 @@
+"""
+Packs the monthly nao NetCDF files of all seasonal forecast models and era5
+into one memory-mapped binary archive for fast loading in notebooks and plot scripts.
+See materials_for_ole_hesselager_tryg_2025/nao_archive.py for the file layout.
+"""
+
+import os
+from materials_for_ole_hesselager_tryg_2025 import config, misc, nao_archive
+
+# input ----------------------------------------------------------
+models     = config.models
+timestamp  = '2009-01_2024-12'
+path_in    = config.dirs['data']
+path_out   = config.dirs['data']
+write2file = True
+# ----------------------------------------------------------------
+
+
+def get_nao_filenames(path_in, models, timestamp):
+    """nao NetCDF filenames keyed by archive entry name"""
+    filenames = {model: f'{path_in}nao_{model}_{config.model_systems[model]}_{timestamp}.nc' for model in models}
+    filenames['era5'] = f'{path_in}nao_era5_{timestamp}.nc'
+
+    missing = [filename for filename in filenames.values() if not os.path.exists(filename)]
+    if missing:
+        raise FileNotFoundError(f"Missing nao files: {missing}")
+
+    return filenames
+
+
+
+if __name__ == "__main__":
+
+    misc.tic()
+    filenames    = get_nao_filenames(path_in, models, timestamp)
+    filename_out = f'{path_out}nao_{timestamp}.naoarc'
+
+    if write2file:
+        nao_archive.build_nao_archive(filenames, filename_out)
+        print(f"Saved archive to: {filename_out}")
+    misc.toc()
@@ -0,0 +1,20 @@
+"""
+materials_for_ole_hesselager_tryg_2025
+
+Submodules are imported on first attribute access, so importing the package
+(or config/misc) does not pull in numpy, xarray, matplotlib etc.
+"""
+
+import importlib
+
+__all__ = ['config', 'misc', 'nao_archive', 'features', 'regression']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
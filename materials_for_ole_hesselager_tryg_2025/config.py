@@ -4,6 +4,7 @@ hard coded paths in materials_for_ole_hesselager_tryg_2025
 
 cf_space             = "/nird/projects/NS9873K/"
 proj                 = "/nird/home/edu061/cf-materials_for_ole_hesselager_tryg_2025/"
+data                 = proj + "data/"
 data_interim         = proj + "data/interim/"
 fig                  = proj + "fig/"
 
@@ -23,11 +24,13 @@ processed_era5_forecast_monthly = processed + 'era5/monthly/seasonal_forecast_fo
 processed_noaa                  = processed + 'noaa/'
 processed_tryg                  = processed + 'tryg/'
 processed_skadepool             = processed + 'skadepool/'
+processed_features              = processed + 'features/'
 processed_glm                   = processed + 'fitted_models/glm/'
 processed_lr                    = processed + 'fitted_models/lr/'
 
 
 dirs = {"proj":proj,
+        "data":data,
         "data_interim":data_interim,
         "fig":fig,
         "raw":raw,
@@ -45,6 +48,7 @@ dirs = {"proj":proj,
         "processed_noaa":processed_noaa,
         "processed_tryg":processed_tryg,
         "processed_skadepool":processed_skadepool,
+        "processed_features":processed_features,
         "processed_glm":processed_glm,
         "processed_lr":processed_lr,
 }        
@@ -0,0 +1,233 @@
+"""
+Builds model-ready design matrices that join monthly NAO forecast features
+with insurance claims aggregated by region and month.
+
+One design matrix is produced per (model, lead month). Rows are (region, valid month),
+columns are claims targets and NAO features. Matrices are written as columnar
+NetCDF files (one variable per column along a 'sample' dimension).
+xarray is only imported when design matrices are written or read.
+"""
+
+import os
+import hashlib
+import warnings
+import numpy  as np
+import pandas as pd
+
+feature_names = ['nao_mean', 'nao_spread', 'nao_frac_positive']
+target_names  = ['n_claims', 'claims_total']
+
+
+def aggregate_claims_monthly(claims, region_col='region', date_col='date', amount_col='amount'):
+    """
+    Aggregates individual claims into counts and totals per region and calendar month.
+    Region-months without claims are included with zeros.
+
+    Parameters:
+    - claims: pandas DataFrame with one row per claim
+    - region_col, date_col, amount_col: column names in claims
+
+    Returns:
+    - pandas DataFrame with columns region, valid_time (month start), n_claims, claims_total
+    """
+
+    valid_time = pd.to_datetime(claims[date_col]).dt.to_period('M').dt.to_timestamp()
+    df         = pd.DataFrame({'region': claims[region_col].values, 'valid_time': valid_time.values, 'amount': claims[amount_col].values})
+    df         = df.groupby(['region', 'valid_time'])['amount'].agg(n_claims='size', claims_total='sum')
+
+    # fill region-months without claims
+    regions = df.index.get_level_values('region').unique().sort_values()
+    months  = pd.date_range(valid_time.min(), valid_time.max(), freq='MS')
+    index   = pd.MultiIndex.from_product([regions, months], names=['region', 'valid_time'])
+    df      = df.reindex(index, fill_value=0).reset_index()
+
+    return df
+
+
+
+def nao_forecast_features(ds, lead_month):
+    """
+    Calculates NAO features per forecast for a given lead month.
+    valid_time follows the convention of the plot scripts, i.e. lead month 1 is the init month.
+
+    Parameters:
+    - ds: xarray Dataset of a nao file (calc-nao-forecast-monthly.py or
+      calc-nao-era5-forecast-format-monthly.py) or the matching nao_archive entry
+    - lead_month: int (1, 2, 3, ...)
+
+    Returns:
+    - pandas DataFrame with columns init_time, valid_time and feature_names.
+      For era5 (no ensemble) the spread is zero and frac_positive is 0 or 1.
+    """
+
+    ds_lead    = ds.sel(forecastMonth=lead_month)
+    init_times = pd.to_datetime(ds_lead['forecast_reference_time'].values)
+
+    if 'nao_ensemble' in ds_lead:
+        ensemble  = ds_lead['nao_ensemble'].transpose('number', 'forecast_reference_time').values
+        nao_mean  = ds_lead['nao_ensemble_mean'].values
+        n_members = np.sum(np.isfinite(ensemble), axis=0)
+
+        # missing init dates are all-NaN and give NaN features
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            nao_spread    = np.nanstd(ensemble, axis=0)
+            frac_positive = np.sum(ensemble > 0, axis=0) / n_members
+    else:
+        nao_mean      = ds_lead['nao'].values
+        nao_spread    = np.where(np.isfinite(nao_mean), 0.0, np.nan)
+        frac_positive = np.where(np.isfinite(nao_mean), (nao_mean > 0).astype(float), np.nan)
+
+    return pd.DataFrame({'init_time': init_times,
+                         'valid_time': init_times + pd.DateOffset(months=(lead_month-1)),
+                         'nao_mean': nao_mean,
+                         'nao_spread': nao_spread,
+                         'nao_frac_positive': frac_positive})
+
+
+
+def build_design_matrix(claims_monthly, features, model, lead_month):
+    """
+    Joins monthly claims with NAO features on valid month.
+    Months without forecast (e.g. missing init dates) are dropped.
+
+    Returns:
+    - pandas DataFrame with one row per (region, valid month)
+    """
+
+    df = claims_monthly.merge(features, on='valid_time', how='inner')
+    df = df.dropna(subset=feature_names)
+    df = df.sort_values(['region', 'valid_time']).reset_index(drop=True)
+
+    df['target_month'] = df['valid_time'].dt.month
+    df['year']         = df['valid_time'].dt.year
+    df['model']        = model
+    df['lead_month']   = lead_month
+
+    return df
+
+
+
+def input_fingerprint(claims_monthly, features):
+    """sha256 of the claims and nao features a design matrix is built from"""
+    sha = hashlib.sha256()
+    for df in [claims_monthly, features]:
+        sha.update(','.join(df.columns).encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return sha.hexdigest()
+
+
+
+def write_design_matrix(df, filename_out, fingerprint=''):
+    """
+    writes design matrix as columnar NetCDF along dimension 'sample'.
+    fingerprint (see input_fingerprint) is stored in the attrs so that
+    build_design_matrices can tell whether the file is up to date.
+    Written to a temporary file first and then moved into place, so an interrupted
+    run never leaves a partial file that build_design_matrices would skip.
+    """
+    import xarray as xr
+    ds           = xr.Dataset.from_dataframe(df.rename_axis('sample'))
+    ds['region'] = ds['region'].astype(str)
+    ds['model']  = ds['model'].astype(str)
+    ds.attrs['input_fingerprint'] = fingerprint
+
+    filename_tmp = filename_out + '.tmp'
+    ds.to_netcdf(filename_tmp)
+    os.replace(filename_tmp, filename_out)
+    return filename_out
+
+
+
+def read_design_matrix(filename):
+    """reads design matrix written by write_design_matrix into a pandas DataFrame"""
+    import xarray as xr
+    with xr.open_dataset(filename) as ds:
+        df = ds.to_dataframe().reset_index(drop=True)
+    return df
+
+
+
+def read_design_matrix_fingerprint(filename):
+    """returns the input fingerprint stored in a design matrix file, '' if there is none"""
+    import xarray as xr
+    with xr.open_dataset(filename) as ds:
+        return ds.attrs.get('input_fingerprint', '')
+
+
+
+def design_matrix_filename(path, model, system, lead_month):
+    if system is None:
+        return f'{path}design_{model}_lead-{lead_month}.nc'
+    return f'{path}design_{model}_{system}_lead-{lead_month}.nc'
+
+
+
+def build_design_matrices(claims_monthly, datasets, lead_months, systems, path_out, overwrite=False):
+    """
+    Builds and writes one design matrix per (model, lead month). Each matrix is
+    written as soon as it is built, so an interrupted run can be resumed. An
+    existing file is only kept if it was built from the same claims and nao
+    features (same input_fingerprint), otherwise it is rebuilt.
+
+    Parameters:
+    - claims_monthly: output of aggregate_claims_monthly
+    - datasets: dict mapping model name to nao xarray Dataset
+    - lead_months: list of int
+    - systems: dict mapping model name to system number (None for era5)
+    - path_out: str, output directory
+    - overwrite: bool, rebuild all files regardless of their fingerprint
+
+    Returns:
+    - dict mapping (model, lead_month) to filename
+    """
+
+    filenames = {}
+    for model, ds in datasets.items():
+        for lead_month in lead_months:
+            filename_out = design_matrix_filename(path_out, model, systems.get(model), lead_month)
+            features     = nao_forecast_features(ds, lead_month)
+            fingerprint  = input_fingerprint(claims_monthly, features)
+            filenames[(model, lead_month)] = filename_out
+
+            if not overwrite and os.path.exists(filename_out):
+                if read_design_matrix_fingerprint(filename_out) == fingerprint:
+                    continue
+                print(f"Inputs changed since {filename_out} was built, rebuilding it")
+
+            df = build_design_matrix(claims_monthly, features, model, lead_month)
+            write_design_matrix(df, filename_out, fingerprint)
+
+    return filenames
+
+
+
+def synthetic_claims(nao, regions, seed=0, base_rate=20.0, nao_effect=0.3, mean_amount=1e4):
+    """
+    Generates a synthetic claims table for testing the pipeline. Monthly claim counts
+    per region are Poisson with log-rate linear in the observed nao, amounts are
+    exponentially distributed.
+
+    Parameters:
+    - nao: pandas Series of observed (standardized) nao indexed by month start
+    - regions: list of region names
+    - seed: int, random seed
+    - base_rate: float, mean number of claims per region and month at nao = 0
+    - nao_effect: float, log-rate change per unit nao
+    - mean_amount: float, mean claim amount
+
+    Returns:
+    - pandas DataFrame with columns region, date, amount (one row per claim)
+    """
+
+    rng  = np.random.default_rng(seed)
+    rows = []
+    for i, region in enumerate(regions):
+        rate = base_rate * (1 + i) * np.exp(nao_effect * nao.fillna(0).values)
+        for month, n in zip(nao.index, rng.poisson(rate)):
+            days = rng.integers(0, pd.Timestamp(month).days_in_month, size=n)
+            rows.append(pd.DataFrame({'region': region,
+                                      'date': pd.Timestamp(month) + pd.to_timedelta(days, unit='D'),
+                                      'amount': rng.exponential(mean_amount, size=n)}))
+
+    return pd.concat(rows, ignore_index=True)
@@ -3,12 +3,6 @@ Collection of useful miscellaneous functions
 """
 
 import time
-import numpy  as np
-import xarray as xr
-from scipy    import signal
-import os
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
 
 def tic():
     """
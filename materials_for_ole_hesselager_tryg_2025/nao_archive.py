@@ -0,0 +1,219 @@
+"""
+Packed, memory-mapped binary archive of NAO timeseries for fast interactive loading.
+
+The archive is a single file holding the NAO arrays and coordinates of several
+NetCDF files (one entry per model, plus era5):
+
+    magic (8 bytes) | header length (uint64) | json header | padding | array blocks
+
+Each array block starts on an ALIGN byte boundary so that arrays can be
+returned as zero-copy views into one np.memmap of the file. The header also
+records the source NetCDF filenames and modification times so that a stale
+archive can be detected.
+Only numpy is needed to open an archive, xarray is imported on first use.
+"""
+
+import os
+import json
+import functools
+import numpy as np
+
+MAGIC   = b'NAOARC01'
+VERSION = 2
+ALIGN   = 64
+
+
+def _pad(nbytes):
+    return (-nbytes) % ALIGN
+
+
+def build_nao_archive(filenames_in, filename_out):
+    """
+    Packs NAO NetCDF files into one memory-mappable binary archive.
+
+    Parameters:
+    - filenames_in: dict mapping entry name (e.g. 'ecmwf', 'era5') to NetCDF filename
+    - filename_out: str, archive filename. Written to a temporary file first and
+      then moved into place so readers never see a partial archive.
+    Only numeric and datetime variables are supported, object (e.g. string)
+    arrays raise a TypeError.
+
+    Returns:
+    - filename_out
+    """
+
+    import xarray as xr
+
+    header = {'version': VERSION, 'entries': {}, 'sources': {}}
+    blocks = []
+    offset = 0
+
+    def add_block(values, name, filename):
+        nonlocal offset
+        values = np.ascontiguousarray(values)
+        if values.dtype.kind == 'O':
+            raise TypeError(f"Cannot pack object array {name} from {filename} into a NAO archive")
+        meta   = {'offset': offset, 'shape': list(values.shape), 'dtype': values.dtype.str}
+        blocks.append(values)
+        offset = offset + values.nbytes + _pad(values.nbytes)
+        return meta
+
+    for name, filename in filenames_in.items():
+        header['sources'][name] = {'filename': os.path.abspath(filename), 'mtime_ns': os.stat(filename).st_mtime_ns}
+        with xr.open_dataset(filename) as ds:
+            entry = {'coords': {}, 'data_vars': {}}
+            for coord in ds.coords:
+                meta         = add_block(ds[coord].values, coord, filename)
+                meta['dims'] = list(ds[coord].dims)
+                entry['coords'][coord] = meta
+            for var in ds.data_vars:
+                meta          = add_block(ds[var].values, var, filename)
+                meta['dims']  = list(ds[var].dims)
+                meta['attrs'] = {k: str(v) for k, v in ds[var].attrs.items()}
+                entry['data_vars'][var] = meta
+            header['entries'][name] = entry
+
+    # data section starts after the header, aligned
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start   = len(MAGIC) + 8 + len(header_bytes)
+    data_start   = data_start + _pad(data_start)
+
+    filename_tmp = filename_out + '.tmp'
+    with open(filename_tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for values in blocks:
+            f.write(values.tobytes())
+            f.write(b'\0' * _pad(values.nbytes))
+    os.replace(filename_tmp, filename_out)
+
+    return filename_out
+
+
+
+@functools.lru_cache(maxsize=None)
+def _scaled_backend_array():
+    """defined on first use so that xarray is not imported with this module"""
+    from xarray.backends import BackendArray
+    from xarray.core     import indexing
+
+    class ScaledBackendArray(BackendArray):
+        """read-only array that divides by a constant only for the slice being indexed"""
+
+        def __init__(self, array, divide_by):
+            self.array     = array
+            self.divide_by = divide_by
+            self.shape     = array.shape
+            # dtype of the true division result, e.g. float64 for integer arrays
+            self.dtype     = (np.empty(0, dtype=array.dtype) / divide_by).dtype
+
+        def __getitem__(self, key):
+            return indexing.explicit_indexing_adapter(key, self.shape, indexing.IndexingSupport.BASIC, self._raw_indexing_method)
+
+        def _raw_indexing_method(self, key):
+            return self.array[key] / self.divide_by
+
+    return ScaledBackendArray, indexing.LazilyIndexedArray
+
+
+
+class NaoArchive:
+    """
+    Read-only view of an archive written by build_nao_archive.
+    All arrays are views into a single np.memmap of the file, nothing is read
+    from disk until the values are accessed.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._buffer  = np.memmap(filename, dtype=np.uint8, mode='r')
+
+        if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not a NAO archive: {filename}")
+
+        header_length = int(self._buffer[len(MAGIC):len(MAGIC) + 8].view(np.uint64)[0])
+        header_start  = len(MAGIC) + 8
+        self.header   = json.loads(bytes(self._buffer[header_start:header_start + header_length]))
+
+        if self.header['version'] != VERSION:
+            raise ValueError(f"Unsupported NAO archive version {self.header['version']} in {filename}, rebuild it with calc-nao-archive.py")
+
+        data_start       = header_start + header_length
+        self._data_start = data_start + _pad(data_start)
+
+    @property
+    def names(self):
+        return list(self.header['entries'])
+
+    def stale_sources(self):
+        """
+        returns source NetCDF files that were modified since the archive was built.
+        Sources that no longer exist are not reported, the archive is then the only copy.
+        """
+        stale = []
+        for source in self.header['sources'].values():
+            if os.path.exists(source['filename']) and os.stat(source['filename']).st_mtime_ns != source['mtime_ns']:
+                stale.append(source['filename'])
+        return stale
+
+    def _view(self, meta):
+        dtype = np.dtype(meta['dtype'])
+        start = self._data_start + meta['offset']
+        stop  = start + dtype.itemsize * int(np.prod(meta['shape']))
+        return self._buffer[start:stop].view(dtype).reshape(meta['shape'])
+
+    def _entry(self, name):
+        if name not in self.header['entries']:
+            raise KeyError(f"{name} not in NAO archive {self.filename}, available: {self.names}")
+        return self.header['entries'][name]
+
+    def coords(self, name):
+        """returns dict of zero-copy coordinate arrays for an entry"""
+        return {coord: self._view(meta) for coord, meta in self._entry(name)['coords'].items()}
+
+    def raw(self, name, var):
+        """returns zero-copy np.ndarray view of a data variable in its stored units"""
+        return self._view(self._entry(name)['data_vars'][var])
+
+    def to_dataset(self, name, divide_by=1, scaled_vars=None):
+        """
+        Returns an xarray Dataset backed by the memory-mapped archive.
+
+        Parameters:
+        - name: str, archive entry (e.g. 'ecmwf', 'era5')
+        - divide_by: number scaled_vars are divided by (e.g. 1000 as in the plot scripts).
+          Scaling is lazy, i.e. only applied to the values that are actually selected/loaded.
+        - scaled_vars: list of variable names to scale. Default is all variables
+          with units 'Pa'.
+
+        Returns:
+        - xarray Dataset with the same coords, variables and attrs as the source NetCDF,
+          except that scaled variables have no 'units' attribute.
+        """
+        import xarray as xr
+
+        entry     = self._entry(name)
+        coords    = {coord: (meta['dims'], self._view(meta)) for coord, meta in entry['coords'].items()}
+        data_vars = {}
+
+        if scaled_vars is None:
+            scaled_vars = [var for var, meta in entry['data_vars'].items() if meta['attrs'].get('units') == 'Pa']
+
+        for var, meta in entry['data_vars'].items():
+            values = self._view(meta)
+            attrs  = dict(meta['attrs'])
+            if var in scaled_vars and divide_by != 1:
+                ScaledBackendArray, LazilyIndexedArray = _scaled_backend_array()
+                values = LazilyIndexedArray(ScaledBackendArray(values, divide_by))
+                attrs.pop('units', None)
+            data_vars[var] = xr.Variable(meta['dims'], values, attrs=attrs)
+
+        return xr.Dataset(data_vars, coords=coords)
+
+
+
+def load_nao_archive(filename):
+    """opens a NAO archive written by build_nao_archive"""
+    return NaoArchive(filename)
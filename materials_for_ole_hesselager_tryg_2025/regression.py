@@ -0,0 +1,171 @@
+"""
+Batch fitting of regression models to the design matrices from features.py.
+For every model x lead month x target month combination a poisson GLM is fitted
+to claim counts and a linear regression to claim totals. Each combination
+uses an intercept, one dummy per region (except the first) and the NAO features.
+Design matrix files are fitted in parallel, one worker per (model, lead month) file.
+statsmodels and xarray are imported on first use so that importing this module stays cheap.
+Workers are forked from a forkserver that has them preloaded, so each worker starts
+in milliseconds regardless of the platform's default start method.
+"""
+
+import warnings
+import multiprocessing
+import numpy  as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools          import repeat
+from materials_for_ole_hesselager_tryg_2025 import features
+
+
+def design_arrays(df, predictors, response):
+    """
+    Returns regressor matrix X = [intercept, region dummies, predictors] and response y.
+    Only the intercept and predictor coefficients are of interest, their column
+    indices in X are returned as well.
+    """
+    dummies = pd.get_dummies(df['region'], drop_first=True, dtype=float).values
+    X       = np.column_stack([np.ones(len(df)), dummies, df[predictors].values.astype(float)])
+    y       = df[response].values.astype(float)
+    keep    = np.r_[0, np.arange(X.shape[1] - len(predictors), X.shape[1])]
+    return X, y, keep
+
+
+
+def fit_lr(X, y):
+    """ordinary least squares, returns coefficients and r2"""
+    coef   = np.linalg.lstsq(X, y, rcond=None)[0]
+    ss_res = np.sum((y - X @ coef)**2)
+    ss_tot = np.sum((y - y.mean())**2)
+    r2     = 1 - ss_res/ss_tot if ss_tot > 0 else np.nan
+    return coef, r2
+
+
+
+def fit_glm(X, y):
+    """poisson GLM with log link, returns coefficients, p-values and deviance"""
+    import statsmodels.api as sm
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        result = sm.GLM(y, X, family=sm.families.Poisson()).fit()
+    return result.params, result.pvalues, result.deviance
+
+
+
+def worker_context():
+    """
+    multiprocessing context for the fitting workers. The forkserver process imports
+    statsmodels, xarray and this module once, and every worker is forked from it.
+    Falls back to the default start method where forkserver is unavailable (windows).
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['statsmodels.api', 'xarray', __name__])
+    return context
+
+
+
+def fit_design_matrix(filename, target_months, predictors, response_glm, response_lr):
+    """
+    Fits GLM and LR for all target months of one design matrix file.
+
+    Returns:
+    - dict of numpy arrays with leading dimension target_month. Combinations with
+      fewer samples than parameters are NaN. Predictors that are constant within a
+      target month (e.g. nao_spread for era5) are left out of the fit and their
+      coefficients and p-values are NaN.
+    """
+
+    df       = features.read_design_matrix(filename)
+    n_target = len(target_months)
+    n_coef   = len(predictors) + 1
+    out      = {'glm_coef': np.full((n_target, n_coef), np.nan),
+                'glm_pvalue': np.full((n_target, n_coef), np.nan),
+                'glm_deviance': np.full(n_target, np.nan),
+                'lr_coef': np.full((n_target, n_coef), np.nan),
+                'lr_r2': np.full(n_target, np.nan),
+                'n_samples': np.zeros(n_target, dtype=int)}
+
+    for i, target_month in enumerate(target_months):
+        df_month            = df[df['target_month'] == target_month]
+        out['n_samples'][i] = len(df_month)
+
+        # constant predictors are collinear with the intercept and can't be estimated
+        varying = [p for p in predictors if df_month[p].nunique() > 1]
+        columns = [0] + [1 + predictors.index(p) for p in varying]
+
+        X, y_glm, keep = design_arrays(df_month, varying, response_glm)
+        if len(df_month) <= X.shape[1]:
+            continue
+
+        coef, pvalue, deviance        = fit_glm(X, y_glm)
+        out['glm_coef'][i, columns]   = coef[keep]
+        out['glm_pvalue'][i, columns] = pvalue[keep]
+        out['glm_deviance'][i]        = deviance
+
+        X, y_lr, keep              = design_arrays(df_month, varying, response_lr)
+        coef, r2                   = fit_lr(X, y_lr)
+        out['lr_coef'][i, columns] = coef[keep]
+        out['lr_r2'][i]            = r2
+
+    return out
+
+
+
+def fit_all(filenames, target_months=np.arange(1,13,1), predictors=features.feature_names,
+            response_glm='n_claims', response_lr='claims_total', n_jobs=1):
+    """
+    Fits GLM and LR for all model x lead month x target month combinations.
+
+    Parameters:
+    - filenames: dict mapping (model, lead_month) to design matrix filename,
+      as returned by features.build_design_matrices
+    - target_months: calendar months (1-12) to fit separately
+    - predictors: list of feature columns
+    - response_glm, response_lr: response columns for the GLM and LR
+    - n_jobs: int, number of worker processes. 1 runs serially. Scripts calling
+      this with n_jobs > 1 need the usual if __name__ == "__main__": guard.
+
+    Returns:
+    - ds_glm, ds_lr: xarray Datasets with dims (model, lead_month, target_month, predictor)
+    """
+
+    import xarray as xr
+
+    keys = list(filenames)
+    args = ([filenames[key] for key in keys], repeat(list(target_months)), repeat(list(predictors)), repeat(response_glm), repeat(response_lr))
+
+    if n_jobs == 1:
+        results = list(map(fit_design_matrix, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=worker_context()) as executor:
+            results = list(executor.map(fit_design_matrix, *args))
+
+    models      = list(dict.fromkeys(model for model, _ in keys))
+    lead_months = sorted(set(lead_month for _, lead_month in keys))
+    coords      = {'model': models, 'lead_month': lead_months, 'target_month': list(target_months), 'predictor': ['intercept'] + list(predictors)}
+
+    def stack(name):
+        shape  = (len(models), len(lead_months)) + results[0][name].shape
+        values = np.full(shape, np.nan) if results[0][name].dtype.kind == 'f' else np.zeros(shape, dtype=results[0][name].dtype)
+        for (model, lead_month), result in zip(keys, results):
+            values[models.index(model), lead_months.index(lead_month)] = result[name]
+        return values
+
+    dims   = ('model', 'lead_month', 'target_month')
+    ds_glm = xr.Dataset({'coef': (dims + ('predictor',), stack('glm_coef')),
+                         'pvalue': (dims + ('predictor',), stack('glm_pvalue')),
+                         'deviance': (dims, stack('glm_deviance')),
+                         'n_samples': (dims, stack('n_samples'))},
+                        coords=coords)
+    ds_lr  = xr.Dataset({'coef': (dims + ('predictor',), stack('lr_coef')),
+                         'r2': (dims, stack('lr_r2')),
+                         'n_samples': (dims, stack('n_samples'))},
+                        coords=coords)
+
+    ds_glm.attrs['description'] = f"poisson GLM of {response_glm} on region dummies and {', '.join(predictors)}"
+    ds_lr.attrs['description']  = f"linear regression of {response_lr} on region dummies and {', '.join(predictors)}"
+
+    return ds_glm, ds_lr